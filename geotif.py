@@ -32,6 +32,11 @@ def parse_args():
         default="data/output/normalized.png",
         help="Directory to save the output image.",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process the image block by block to bound memory usage.",
+    )
     return parser.parse_args()
 
 
@@ -43,10 +48,14 @@ def main():
         max_size = tuple(args.max_size)
         output_path = args.output_filename
 
-        image = GRDImage(file_path)
-        image.normalize(normalization_format)
-        image.calibrate()
-        image.downsample(max_size)
+        if args.stream:
+            image = GRDImage(file_path, stream=True)
+            image.process_in_blocks(normalization_format, max_size)
+        else:
+            image = GRDImage(file_path, max_size)
+            image.normalize(normalization_format)
+            image.calibrate()
+            image.downsample(max_size)
         image.save_as_png(output_path)
         logger.info(f"Image ID: {image.image_id}, Timestamp: {image.timestamp}")
 
@@ -1,5 +1,7 @@
 import numpy as np
 import os
+import rasterio
+import threading
 from src.image import GRDImage
 
 
@@ -7,6 +9,62 @@ def test_read_grd():
     image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
     assert isinstance(image.data, np.ndarray), "Data should be a numpy array"
     assert image.data.size > 0, "Data array should not be empty"
+    assert image.data.dtype == np.float32, "Data should be read as float32"
+
+
+def test_read_grd_with_dataset():
+    file_path = "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif"
+    with rasterio.open(file_path) as src:
+        image = GRDImage(file_path, src=src)
+        assert not src.closed, "A dataset supplied by the caller should not be closed"
+        image.normalize("0-1")
+        image.calibrate()
+    assert image.data.size > 0, "Data array should not be empty"
+
+
+def test_read_blocks_ahead_env(monkeypatch):
+    # Record the Env options seen when the reading threads open the file
+    seen_options = []
+    rasterio_open = rasterio.open
+
+    def recording_open(*args, **kwargs):
+        if threading.current_thread() is not threading.main_thread():
+            options = rasterio.env.getenv() if rasterio.env.hasenv() else {}
+            seen_options.append(options.get("GEOTIF_TEST_OPTION"))
+        return rasterio_open(*args, **kwargs)
+
+    monkeypatch.setattr(rasterio, "open", recording_open)
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif", stream=True)
+    with rasterio.Env(GEOTIF_TEST_OPTION="yes"):
+        list(image.read_blocks_ahead(workers=2))
+    assert seen_options, "Reading threads should open the file"
+    assert all(
+        option == "yes" for option in seen_options
+    ), "Reading threads should use the options of the caller's Env"
+
+
+def test_process_in_blocks_with_dataset():
+    # The dataset lives in memory, so any read that reopens file_path fails
+    file_path = "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif"
+    with open(file_path, "rb") as f:
+        memory_file = rasterio.MemoryFile(f.read())
+    with memory_file, memory_file.open() as src:
+        image = GRDImage(os.path.basename(file_path), stream=True, src=src)
+        processed_image = image.process_in_blocks("0-1", (256, 180))
+    expected_image = _process_in_memory(file_path, "0-1", (256, 180))
+    assert (
+        np.abs(processed_image.astype(int) - expected_image).max() <= 1
+    ), "Processing in blocks should only read from the supplied dataset"
+
+
+def test_read_grd_max_size():
+    image = GRDImage(
+        "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif", max_size=(256, 180)
+    )
+    assert image.data.shape == (
+        180,
+        126,
+    ), "Decimated data should fit within max_size keeping the aspect ratio"
 
 
 def test_normalize_0_to_1():
@@ -34,6 +92,29 @@ def test_normalize_0_to_255():
     assert image.data.dtype == np.float32, "Normalized data should be of type float32"
 
 
+def test_normalize_exact_endpoints():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
+    for data_max in (21, 41, 4093):
+        for output_format, low, high in (
+            ("0-1", 0, 1),
+            ("-1-1", -1, 1),
+            ("0-255", 0, 255),
+        ):
+            image.data = np.array([[0, 3], [7, data_max]], dtype=np.float32)
+            image.normalize(output_format)
+            assert image.data.min() == low, "Minimum should map exactly to the range"
+            assert image.data.max() == high, "Maximum should map exactly to the range"
+
+
+def test_normalize_keeps_assigned_data():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
+    raw_data = image.data.copy()
+    image.data = raw_data
+    image.normalize("0-1")
+    assert image.data is not raw_data, "Assigned data should not be normalized in place"
+    assert raw_data.max() > 1, "Assigned data should be left untouched"
+
+
 def test_normalize_invalid_format():
     image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
     try:
@@ -43,12 +124,53 @@ def test_normalize_invalid_format():
         assert True
 
 
+def test_normalize_ignores_nan():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
+    image.data[0, 0] = np.nan
+    image.data[image.data.shape[0] // 2, 3] = np.nan
+    image.normalize("0-1")
+    assert np.nanmin(image.data) == 0, "NaNs should be ignored for the minimum"
+    assert np.nanmax(image.data) == 1, "NaNs should be ignored for the maximum"
+
+
+def test_normalize_empty():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
+    image.data = np.empty((0, 0), dtype=np.float32)
+    try:
+        image.normalize("0-1")
+        assert False, "Should raise ValueError for empty data"
+    except ValueError:
+        assert True
+
+
+def test_normalize_constant():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
+    image.data = np.full((4, 4), 7, dtype=np.float32)
+    try:
+        image.normalize("0-1")
+        assert False, "Should raise ValueError for constant data"
+    except ValueError:
+        assert True
+
+
+def _expected_calibration(image):
+    # sigma0_db in float64 from the raw data, clipped to -30..0 dB and scaled to 0-255
+    with rasterio.open(image.file_path) as src:
+        grd_data = src.read(1).astype(np.float64)
+    data = (grd_data - grd_data.min()) / (grd_data.max() - grd_data.min())
+    sigma0_db = 10 * np.log10(image.calibration_factor * data**2 + 1e-10)
+    return np.floor((np.clip(sigma0_db, -30, 0) + 30) * 255 / 30)
+
+
 def test_calibrate_0_to_1():
     image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
     image.normalize("0-1")
     image.calibrate()
     assert image.data is not None, "Calibration should produce data"
-    assert not np.any(np.isnan(image.data)), "Calibrated data should not contain NaNs"
+    assert image.data.dtype == np.uint8, "Calibrated data should be of type uint8"
+    assert np.all(
+        np.abs(image.data.astype(int) - _expected_calibration(image)) <= 1
+    ), "Calibrated data should match sigma0_db quantized to uint8"
 
 
 def test_calibrate_minus1_to_1():
@@ -56,7 +178,9 @@ def test_calibrate_minus1_to_1():
     image.normalize("-1-1")
     image.calibrate()
     assert image.data is not None, "Calibration should produce data"
-    assert not np.any(np.isnan(image.data)), "Calibrated data should not contain NaNs"
+    assert np.all(
+        np.abs(image.data.astype(int) - _expected_calibration(image)) <= 1
+    ), "Calibrated data should match sigma0_db quantized to uint8"
 
 
 def test_calibrate_0_to_255():
@@ -64,7 +188,18 @@ def test_calibrate_0_to_255():
     image.normalize("0-255")
     image.calibrate()
     assert image.data is not None, "Calibration should produce data"
-    assert not np.any(np.isnan(image.data)), "Calibrated data should not contain NaNs"
+    assert np.all(
+        np.abs(image.data.astype(int) - _expected_calibration(image)) <= 1
+    ), "Calibrated data should match sigma0_db quantized to uint8"
+
+
+def test_calibrate_without_normalize():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
+    try:
+        image.calibrate()
+        assert False, "Should raise ValueError if data is not normalized"
+    except ValueError:
+        assert True
 
 
 def test_downsample():
@@ -77,6 +212,99 @@ def test_downsample():
     ), "Downsampled data should have the correct shape"
 
 
+def test_read_blocks_ahead():
+    image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif", stream=True)
+    blocks = list(image.read_blocks())
+    blocks_ahead = list(image.read_blocks_ahead(workers=2))
+    assert len(blocks) == len(blocks_ahead), "Should read the same number of blocks"
+    for (window, block), (window_ahead, block_ahead) in zip(blocks, blocks_ahead):
+        assert window == window_ahead, "Blocks should be returned in file order"
+        assert np.array_equal(block, block_ahead), "Blocks should have the same data"
+
+
+def _process_in_memory(file_path, output_format, size):
+    image = GRDImage(file_path)
+    image.normalize(output_format)
+    image.calibrate()
+    return image.downsample(size)
+
+
+def test_process_in_blocks():
+    file_path = "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif"
+    image = GRDImage(file_path, stream=True)
+    assert image.data is None, "Data should not be read in stream mode"
+    processed_image = image.process_in_blocks("0-1", (256, 180))
+    assert processed_image.shape == (
+        180,
+        126,
+    ), "Processed data should have the correct shape"
+    expected_image = _process_in_memory(file_path, "0-1", (256, 180))
+    assert (
+        np.abs(processed_image.astype(int) - expected_image).max() <= 1
+    ), "Processing in blocks should match the in-memory pipeline"
+
+
+def test_read_grd_max_size_matches_process_in_blocks():
+    # Both modes normalize with the full resolution min and max. They only differ
+    # in calibrating averaged data vs averaging calibrated data.
+    file_path = "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif"
+    image = GRDImage(file_path, max_size=(256, 180))
+    image.normalize("0-1")
+    image.calibrate()
+    processed_image = GRDImage(file_path, stream=True).process_in_blocks(
+        "0-1", (256, 180)
+    )
+    assert (
+        image.data.shape == processed_image.shape
+    ), "Both modes should produce the same shape"
+    difference = image.data.astype(int) - processed_image
+    assert (
+        abs(difference.mean()) < 3
+    ), "Decimated read should match the brightness of processing in blocks"
+    assert (
+        np.abs(difference).mean() < 3
+    ), "Decimated read should match processing in blocks"
+
+
+def test_read_grd_max_size_uses_band_statistics(tmp_path):
+    file_path = "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif"
+    stats_path = str(tmp_path / os.path.basename(file_path))
+    with rasterio.open(file_path) as src:
+        with rasterio.open(stats_path, "w", **src.profile) as dst:
+            dst.write(src.read(1), 1)
+            dst.update_tags(**src.tags())
+            dst.update_tags(1, STATISTICS_MINIMUM=0, STATISTICS_MAXIMUM=65535)
+
+    image = GRDImage(stats_path, max_size=(256, 180))
+    image.normalize("0-1")
+    assert (
+        image.data.max() < 0.5
+    ), "Normalization should use the range of the stored band statistics"
+
+
+def test_process_in_blocks_stripped(tmp_path):
+    # One-row strips: every block is smaller than one output pixel
+    file_path = "data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif"
+    stripped_path = str(tmp_path / os.path.basename(file_path))
+    with rasterio.open(file_path) as src:
+        profile = src.profile
+        profile.update(tiled=False, blockysize=1)
+        profile.pop("blockxsize", None)
+        with rasterio.open(stripped_path, "w", **profile) as dst:
+            dst.write(src.read(1), 1)
+            dst.update_tags(**src.tags())
+
+    image = GRDImage(stripped_path, stream=True)
+    processed_image = image.process_in_blocks("0-1", (256, 256))
+    expected_image = _process_in_memory(file_path, "0-1", (256, 256))
+    assert (
+        processed_image.shape == expected_image.shape
+    ), "Processed data should have the correct shape"
+    assert (
+        np.abs(processed_image.astype(int) - expected_image).max() <= 1
+    ), "Every strip should contribute to the downsampled image"
+
+
 def test_save_as_png():
     image = GRDImage("data/input/ICEYE_X4_GRD_SM_9281_20190903T144946.tif")
     image.normalize("0-255")